@@ -0,0 +1,159 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+
+MAXIMO_EJERCICIOS = 50
+
+# Un ejercicio es cualquier objeto JSON, pero acotado: cada definición distinta es un
+# documento más del catálogo compartido
+MAXIMO_BYTES_EJERCICIO = 2048
+MAXIMO_CLAVES_EJERCICIO = 30
+
+
+class EjercicioInvalido(ValueError):
+    pass
+
+
+def canonizar(valor):
+    """Forma canónica de un valor JSON: espacios repetidos colapsados y 8.0 igual a 8.
+
+    El orden de las claves lo fija id_ejercicio al serializar.
+    """
+    if isinstance(valor, dict):
+        for clave in valor:
+            if not isinstance(clave, str) or clave.startswith('$'):
+                raise EjercicioInvalido(f'Clave no admitida en un ejercicio: {clave}')
+        return {clave: canonizar(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [canonizar(v) for v in valor]
+    if isinstance(valor, str):
+        return ' '.join(valor.split())
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if valor is None or isinstance(valor, (bool, int, float)):
+        return valor
+    raise EjercicioInvalido(f'Valor no admitido en un ejercicio: {type(valor).__name__}')
+
+
+def _contar_claves(valor):
+    if isinstance(valor, dict):
+        return len(valor) + sum(_contar_claves(v) for v in valor.values())
+    if isinstance(valor, list):
+        return sum(_contar_claves(v) for v in valor)
+    return 0
+
+
+def _serializar(definicion):
+    try:
+        return json.dumps(definicion, sort_keys=True, ensure_ascii=False, allow_nan=False)
+    except ValueError:
+        raise EjercicioInvalido('Los ejercicios no admiten NaN ni infinitos') from None
+
+
+def normalizar_ejercicio(ejercicio):
+    """Forma canónica de un ejercicio recibido por la API.
+
+    Se admite cualquier objeto JSON; solo se rechazan los que no son objetos
+    o superan MAXIMO_BYTES_EJERCICIO / MAXIMO_CLAVES_EJERCICIO.
+    """
+    if not isinstance(ejercicio, dict):
+        raise EjercicioInvalido('Cada ejercicio debe ser un objeto')
+    definicion = canonizar(ejercicio)
+    if _contar_claves(definicion) > MAXIMO_CLAVES_EJERCICIO:
+        raise EjercicioInvalido(f'Un ejercicio admite hasta {MAXIMO_CLAVES_EJERCICIO} campos')
+    if len(_serializar(definicion).encode('utf-8')) > MAXIMO_BYTES_EJERCICIO:
+        raise EjercicioInvalido(f'Un ejercicio admite hasta {MAXIMO_BYTES_EJERCICIO} bytes')
+    return definicion
+
+
+def normalizar_ejercicios(ejercicios):
+    if not isinstance(ejercicios, list):
+        raise EjercicioInvalido('ejercicios debe ser una lista')
+    if len(ejercicios) > MAXIMO_EJERCICIOS:
+        raise EjercicioInvalido(f'Una rutina admite hasta {MAXIMO_EJERCICIOS} ejercicios')
+    return [normalizar_ejercicio(ejercicio) for ejercicio in ejercicios]
+
+
+def id_ejercicio(definicion):
+    """Id determinista a partir del contenido: definiciones iguales comparten documento."""
+    return ObjectId(hashlib.sha1(_serializar(definicion).encode('utf-8')).digest()[:12])
+
+
+def operaciones_catalogo(definiciones):
+    """UpdateOne con upsert para insertar definiciones sin pisar las existentes."""
+    ahora = datetime.utcnow()
+    return [
+        UpdateOne(
+            {'_id': ejercicio_id},
+            {'$setOnInsert': {'definicion': definicion, 'fecha_creacion': ahora}},
+            upsert=True
+        )
+        for ejercicio_id, definicion in definiciones.items()
+    ]
+
+
+class CatalogoEjercicios:
+    """Caché en memoria, compartida por todo el proceso, de la colección de ejercicios.
+
+    Las definiciones son inmutables (el id sale de su contenido), así que una
+    entrada cargada nunca caduca; solo se desalojan las usadas hace más tiempo
+    cuando se superan `maximo` entradas. Ante ids desconocidos se consultan
+    únicamente esos ids, de modo que en régimen estable hidratar rutinas no
+    cuesta consultas.
+    """
+
+    def __init__(self, maximo=10000):
+        self.maximo = maximo
+        self._definiciones = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, coleccion, ejercicios):
+        """Valida los ejercicios, guarda en el catálogo los nuevos y devuelve la lista de ids.
+
+        Lanza EjercicioInvalido si alguno no es un objeto o supera los límites.
+        """
+        definiciones = normalizar_ejercicios(ejercicios)
+        ids = [id_ejercicio(definicion) for definicion in definiciones]
+        nuevas = {
+            ejercicio_id: definicion
+            for ejercicio_id, definicion in zip(ids, definiciones)
+            if ejercicio_id not in self._definiciones
+        }
+        if nuevas:
+            coleccion.bulk_write(operaciones_catalogo(nuevas), ordered=False)
+        with self._lock:
+            self._guardar(dict(zip(ids, definiciones)))
+        return ids
+
+    def hidratar(self, coleccion, ids):
+        """Devuelve las definiciones de `ids` en el mismo orden."""
+        encontradas = {}
+        with self._lock:
+            for ejercicio_id in ids:
+                definicion = self._definiciones.get(ejercicio_id)
+                if definicion is not None:
+                    self._definiciones.move_to_end(ejercicio_id)
+                    encontradas[ejercicio_id] = definicion
+
+        faltantes = [i for i in dict.fromkeys(ids) if i not in encontradas]
+        if faltantes:
+            cargadas = {
+                doc['_id']: doc['definicion']
+                for doc in coleccion.find({'_id': {'$in': faltantes}})
+            }
+            with self._lock:
+                self._guardar(cargadas)
+            encontradas.update(cargadas)
+        return [encontradas.get(ejercicio_id) for ejercicio_id in ids]
+
+    def _guardar(self, definiciones):
+        for ejercicio_id, definicion in definiciones.items():
+            self._definiciones[ejercicio_id] = definicion
+            self._definiciones.move_to_end(ejercicio_id)
+        while len(self._definiciones) > self.maximo:
+            self._definiciones.popitem(last=False)
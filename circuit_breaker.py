@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+from pymongo import monitoring
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError
+
+# Errores que indican que Mongo está lento o caído (no errores de la consulta en sí)
+TIPOS_FALLO = {'NetworkTimeout', 'AutoReconnect', 'ConnectionFailure', 'ExecutionTimeout',
+               'ServerSelectionTimeoutError', 'WaitQueueTimeoutError'}
+CODIGOS_FALLO = {
+    50,     # MaxTimeMSExpired
+    89,     # NetworkTimeout
+    91,     # ShutdownInProgress
+    189,    # PrimarySteppedDown
+    262,    # ExceededTimeLimit
+    10107,  # NotWritablePrimary
+    11600,  # InterruptedAtShutdown
+    13435,  # NotPrimaryNoSecondaryOk
+}
+
+
+def es_transitorio(error):
+    """True si el error es de Mongo lento o caído y reintentar más tarde puede funcionar.
+
+    Errores como DuplicateKeyError, WriteError u OperationFailure (consulta o permisos
+    incorrectos) no se arreglan reintentando: son fallos de la aplicación.
+    """
+    if not isinstance(error, PyMongoError):
+        return False
+    return isinstance(error, (ConnectionFailure, ExecutionTimeout)) or error.timeout
+
+
+class CircuitBreaker(monitoring.CommandListener, monitoring.ServerHeartbeatListener):
+    """Corta el acceso a Mongo tras varios fallos seguidos por lentitud o red.
+
+    Se alimenta de los eventos del driver, así que ve los timeouts aunque las
+    rutas atrapen la excepción. Abierto, `permite()` devuelve False durante
+    `espera` segundos; después deja pasar peticiones y el primer resultado
+    decide si se cierra o vuelve a abrirse.
+    """
+
+    def __init__(self, umbral=5, espera=30):
+        self.umbral = umbral
+        self.espera = espera
+        self._fallos = 0
+        self._abierto_hasta = 0
+        self._lock = threading.Lock()
+
+    def permite(self):
+        return time.monotonic() >= self._abierto_hasta
+
+    def segundos_restantes(self):
+        return max(0, self._abierto_hasta - time.monotonic())
+
+    def registrar_exito(self):
+        if self._fallos:
+            with self._lock:
+                self._fallos = 0
+
+    def registrar_fallo(self):
+        with self._lock:
+            self._fallos += 1
+            if self._fallos >= self.umbral:
+                self._abierto_hasta = time.monotonic() + self.espera
+
+    # Eventos de comandos
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if isinstance(event, monitoring.CommandSucceededEvent):
+            self.registrar_exito()
+
+    def failed(self, event):
+        if isinstance(event, monitoring.ServerHeartbeatFailedEvent):
+            self.registrar_fallo()
+            return
+        fallo = event.failure or {}
+        if fallo.get('errtype') in TIPOS_FALLO or fallo.get('code') in CODIGOS_FALLO:
+            self.registrar_fallo()
+
+
+class CacheObsoleta:
+    """Últimas respuestas correctas por clave, para servirlas si Mongo no responde."""
+
+    def __init__(self, maximo=10000, antiguedad_maxima=600):
+        self.maximo = maximo
+        self.antiguedad_maxima = antiguedad_maxima
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (time.time(), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def obtener(self, clave):
+        """Devuelve (guardado_en, valor) o None si no hay dato o es demasiado viejo."""
+        entrada = self._datos.get(clave)
+        if entrada is None or time.time() - entrada[0] > self.antiguedad_maxima:
+            return None
+        return entrada
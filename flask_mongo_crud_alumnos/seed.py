@@ -1,18 +1,93 @@
-from pymongo import MongoClient
+"""Genera alumnos sintéticos de forma determinista.
+
+Ejemplos:
+    python seed.py                          # 3 alumnos de ejemplo
+    python seed.py --cantidad 1000000 --workers 8
+"""
+import argparse
 import os
+import random
+import struct
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient
 
 MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/escuela")
-client = MongoClient(MONGO_URI)
-db = client.get_default_database()
 
-db.alumnos.delete_many({})
+NOMBRES = ["Ana", "Luis", "María", "Carlos", "Sofía", "Jorge", "Lucía", "Diego", "Valeria",
+           "Eduardo", "Fernanda", "Ángel", "Camila", "Edgar", "Paola", "Ricardo"]
+APELLIDOS = ["López", "García", "Martínez", "Hernández", "Pérez", "González", "Rodríguez",
+             "Sánchez", "Ramírez", "Torres", "Flores", "Rivera", "Gómez", "Díaz"]
+GRUPOS = [f"{grado}{letra}" for grado in range(1, 4) for letra in "ABCD"]
+
+# _id deterministas: instante fijo + prefijo de tipo (4 = alumno, el mismo que usa el
+# generador de Healthy Life para no chocar con sus colecciones) + índice del alumno
+_SEGUNDOS_ID = int((datetime(2026, 1, 1) - datetime(1970, 1, 1)).total_seconds())
+TIPO_ALUMNO = 4
+
+_db = None
+
+
+def iniciar_worker(uri):
+    global _db
+    _db = MongoClient(uri).get_default_database()
+
+
+def id_alumno(indice):
+    return ObjectId(struct.pack(">IBI", _SEGUNDOS_ID, TIPO_ALUMNO, indice) + bytes(3))
+
+
+def generar_alumno(semilla, indice):
+    """Alumno `indice` de la semilla; lo usan este script y el seed.py de Healthy Life."""
+    rng = random.Random(f"{semilla}:{indice}")
+    return {
+        "_id": id_alumno(indice),
+        "nombre": f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}",
+        "edad": rng.randint(12, 19),
+        "grupo": rng.choice(GRUPOS),
+        "promedio": round(rng.uniform(5, 10), 1),
+        "correo": f"alumno{indice}@example.com",
+    }
+
+
+def insertar_rango(args):
+    semilla, inicio, fin, lote = args
+    for i in range(inicio, fin, lote):
+        alumnos = [generar_alumno(semilla, indice) for indice in range(i, min(i + lote, fin))]
+        _db.alumnos.insert_many(alumnos, ordered=False)
+    return fin - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pobla la colección alumnos")
+    parser.add_argument("--cantidad", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lote", type=int, default=1000, help="Documentos por insert_many")
+    parser.add_argument("--uri", default=MONGO_URI)
+    args = parser.parse_args()
+
+    MongoClient(args.uri).get_default_database().alumnos.delete_many({})
+
+    por_tarea = args.lote * 10
+    tareas = [
+        (args.semilla, inicio, min(inicio + por_tarea, args.cantidad), args.lote)
+        for inicio in range(0, args.cantidad, por_tarea)
+    ]
+
+    inicio = time.perf_counter()
+    insertados = 0
+    with Pool(args.workers, initializer=iniciar_worker, initargs=(args.uri,)) as pool:
+        for cantidad in pool.imap_unordered(insertar_rango, tareas):
+            insertados += cantidad
+    transcurrido = max(time.perf_counter() - inicio, 1e-9)
 
-alumnos = [
-    {"nombre": "Edgar López", "edad": 16, "grupo": "3A", "promedio": 8.7, "correo":"edgarlopezelnegrito@gmail.com"},
-    {"nombre": "Angel Polito", "edad": 17, "grupo": "3B", "promedio": 7.9,"correo":"angelpolitoaliaselnose@gmail.com"},
-    {"nombre": " Eduardo López ", "edad": 15, "grupo": "2A", "promedio": 9.2,"correo":"caneduardoviciadoalclash@gmail.com"},
+    print(f"Seed completado. Registros insertados: {insertados:,} "
+          f"en {transcurrido:.1f}s ({insertados / transcurrido:,.0f} docs/s)")
 
-]
 
-db.alumnos.insert_many(alumnos)
-print("Seed completado. Registros insertados:", db.alumnos.count_documents({}))
+if __name__ == "__main__":
+    main()
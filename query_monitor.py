@@ -0,0 +1,132 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+from pymongo import monitoring
+
+logger = logging.getLogger('healthy_life.mongo')
+
+# Comandos internos del driver que no cuentan como consultas de una ruta
+COMANDOS_IGNORADOS = {'hello', 'isMaster', 'ismaster', 'ping', 'endSessions',
+                      'saslStart', 'saslContinue', 'buildInfo', 'killCursors'}
+
+# Lotes siguientes de un cursor: se registran si son lentos, pero no cuentan en el
+# presupuesto (dependen del tamaño del resultado, no de cuántas consultas hace la ruta)
+COMANDOS_SIN_PRESUPUESTO = {'getMore'}
+
+
+class PresupuestoExcedido(AssertionError):
+    pass
+
+
+def forma_filtro(valor):
+    """Reemplaza los valores de un filtro por '?' conservando campos y operadores."""
+    if isinstance(valor, dict):
+        return {clave: forma_filtro(v) for clave, v in valor.items()}
+    if isinstance(valor, list) and valor and isinstance(valor[0], dict):
+        return [forma_filtro(v) for v in valor]
+    return '?'
+
+
+def filtro_de_comando(nombre, comando):
+    if nombre == 'find':
+        return comando.get('filter', {})
+    if nombre == 'count':
+        return comando.get('query', {})
+    if nombre == 'aggregate':
+        return comando.get('pipeline', [])
+    if nombre in ('update', 'delete') and comando.get(nombre + 's'):
+        return comando[nombre + 's'][0].get('q', {})
+    if nombre == 'findAndModify':
+        return comando.get('query', {})
+    return None
+
+
+class RegistroConsultas(monitoring.CommandListener):
+    """Atribuye cada comando de Mongo a la ruta de Flask que lo emitió.
+
+    Los comandos más lentos que `umbral_lento_ms` se registran como warning.
+    En tests, `presupuesto()` permite fijar cuántas consultas puede hacer
+    una ruta.
+    """
+
+    def __init__(self, umbral_lento_ms=100):
+        self.umbral_lento_ms = umbral_lento_ms
+        self._pendientes = {}
+        self._capturas = []
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in COMANDOS_IGNORADOS:
+            return
+        if event.command_name == 'getMore':
+            coleccion = event.command.get('collection')
+        else:
+            coleccion = event.command.get(event.command_name)
+        self._pendientes[(event.connection_id, event.request_id)] = {
+            'endpoint': request.endpoint if has_request_context() else None,
+            'comando': event.command_name,
+            'coleccion': coleccion,
+            'filtro': forma_filtro(filtro_de_comando(event.command_name, event.command))
+        }
+
+    def succeeded(self, event):
+        self._terminar(event)
+
+    def failed(self, event):
+        self._terminar(event)
+
+    def _terminar(self, event):
+        consulta = self._pendientes.pop((event.connection_id, event.request_id), None)
+        if consulta is None:
+            return
+        consulta['duracion_ms'] = event.duration_micros / 1000
+
+        if consulta['duracion_ms'] >= self.umbral_lento_ms:
+            logger.warning(
+                'Consulta lenta en %s: %s %s filtro=%s (%.1f ms)',
+                consulta['endpoint'] or '-', consulta['comando'], consulta['coleccion'],
+                consulta['filtro'], consulta['duracion_ms']
+            )
+
+        if self._capturas:
+            with self._lock:
+                for captura in self._capturas:
+                    captura.append(consulta)
+
+    @contextmanager
+    def capturar(self):
+        """Acumula en una lista las consultas emitidas dentro del bloque."""
+        consultas = []
+        with self._lock:
+            self._capturas.append(consultas)
+        try:
+            yield consultas
+        finally:
+            with self._lock:
+                self._capturas.remove(consultas)
+
+    @contextmanager
+    def presupuesto(self, endpoint, maximo):
+        """Falla si `endpoint` emite más de `maximo` consultas dentro del bloque.
+
+        Los getMore de cursores abiertos por la ruta no cuentan.
+
+        Uso en tests:
+            with registro_consultas.presupuesto('racha_datos', 2):
+                client.get('/racha/datos')
+        """
+        with self.capturar() as consultas:
+            yield consultas
+        propias = [
+            c for c in consultas
+            if c['endpoint'] == endpoint and c['comando'] not in COMANDOS_SIN_PRESUPUESTO
+        ]
+        if len(propias) > maximo:
+            detalle = '\n'.join(
+                f"  {c['comando']} {c['coleccion']} filtro={c['filtro']}" for c in propias
+            )
+            raise PresupuestoExcedido(
+                f'{endpoint} hizo {len(propias)} consultas (máximo {maximo}):\n{detalle}'
+            )
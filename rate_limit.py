@@ -0,0 +1,107 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Cada casilla guarda: hash de la clave, tokens disponibles y último relleno
+_CASILLA = struct.Struct('<Qdd')
+
+
+def ruta_por_defecto():
+    # /dev/shm vive en memoria en Linux; si no existe usamos el temporal del sistema
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'healthy_life_rate_limit.bin')
+
+
+def _hash_clave(clave):
+    # 64 bits bien mezclados y estables entre procesos (hash() cambia con PYTHONHASHSEED)
+    digest = hashlib.blake2b(clave.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1  # 0 = casilla libre
+
+
+class LimitadorTokens:
+    """Cubetas de tokens en una tabla de tamaño fijo mapeada en memoria.
+
+    Todos los workers de gunicorn del mismo host abren el mismo archivo, así
+    que comparten el presupuesto. La tabla es asociativa por conjuntos: cada
+    clave puede ocupar cualquiera de las VIAS casillas de su conjunto, así que
+    dos clientes que caen en el mismo conjunto no se reinician la cubeta entre
+    sí. Solo si el conjunto está lleno se desaloja la cubeta usada hace más
+    tiempo.
+    """
+
+    VIAS = 4
+
+    def __init__(self, ruta=None, casillas=65536):
+        self.conjuntos = max(1, casillas // self.VIAS)
+        self.casillas = self.conjuntos * self.VIAS
+        self._lock = threading.Lock()
+        tamano = self.casillas * _CASILLA.size
+
+        if fcntl is None:
+            self._fd = None
+            self._mapa = mmap.mmap(-1, tamano)
+            return
+
+        self._fd = os.open(ruta or ruta_por_defecto(), os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < tamano:
+            os.ftruncate(self._fd, tamano)
+        self._mapa = mmap.mmap(self._fd, tamano)
+
+    def consumir(self, clave, capacidad, tasa, coste=1):
+        """Consume `coste` tokens de la cubeta de `clave`.
+
+        Devuelve 0 si la petición se admite o los segundos que faltan para
+        que haya tokens suficientes.
+        """
+        h = _hash_clave(clave)
+        inicio = (h % self.conjuntos) * self.VIAS * _CASILLA.size
+        largo = self.VIAS * _CASILLA.size
+        ahora = time.monotonic()
+
+        with self._lock:
+            if self._fd is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, largo, inicio)
+            try:
+                offset, tokens, ultimo = self._buscar_casilla(h, inicio)
+                if tokens is None:
+                    tokens, ultimo = float(capacidad), ahora
+                else:
+                    tokens = min(float(capacidad), tokens + (ahora - ultimo) * tasa)
+
+                if tokens >= coste:
+                    _CASILLA.pack_into(self._mapa, offset, h, tokens - coste, ahora)
+                    return 0
+
+                _CASILLA.pack_into(self._mapa, offset, h, tokens, ahora)
+                return (coste - tokens) / tasa
+            finally:
+                if self._fd is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, largo, inicio)
+
+    def _buscar_casilla(self, h, inicio):
+        """Casilla de `h` en su conjunto: (offset, tokens, último) o (offset, None, None) si es nueva."""
+        desalojo, mas_antiguo = inicio, None
+        for via in range(self.VIAS):
+            offset = inicio + via * _CASILLA.size
+            clave_guardada, tokens, ultimo = _CASILLA.unpack_from(self._mapa, offset)
+            if clave_guardada == h:
+                return offset, tokens, ultimo
+            # Preferir una casilla libre; si no hay, la usada hace más tiempo
+            antiguedad = float('-inf') if clave_guardada == 0 else ultimo
+            if mas_antiguo is None or antiguedad < mas_antiguo:
+                desalojo, mas_antiguo = offset, antiguedad
+        return desalojo, None, None
+
+
+def segundos_retry_after(espera):
+    return str(max(1, math.ceil(espera)))
@@ -1,18 +1,365 @@
-from pymongo import MongoClient
+"""Generador determinista de datos sintéticos para pruebas de rendimiento.
+
+Ejemplos:
+    python seed.py --perfil demo --limpiar
+    python seed.py --perfil 1m-pesado --workers 8
+    python seed.py --usuarios 5000 --rutinas-mediana 40 --alumnos 100000 --semilla 7
+    python seed.py --perfil pequeno --fecha-referencia 2026-01-01
+
+Las rachas terminan en la fecha de referencia (hoy por defecto), así que las
+rutinas recientes caen en la ventana de la racha actual. Misma semilla y misma
+fecha producen los mismos datos.
+"""
+import argparse
+import math
 import os
+import random
+import struct
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import product
+from multiprocessing import Pool
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from werkzeug.security import generate_password_hash
+
+from catalogo import id_ejercicio, operaciones_catalogo
+from flask_mongo_crud_alumnos.seed import APELLIDOS, NOMBRES, generar_alumno
+
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/healthy_life_db")
+
+PERFILES = {
+    "demo": {"usuarios": 20, "rutinas_mediana": 15, "rutinas_p99": 120,
+             "notas_media": 5, "alumnos": 50, "pesados": 0, "rutinas_pesado": 0},
+    "pequeno": {"usuarios": 10_000, "rutinas_mediana": 20, "rutinas_p99": 400,
+                "notas_media": 8, "alumnos": 10_000, "pesados": 1, "rutinas_pesado": 5_000},
+    # 1M usuarios y un usuario extremo (el caso p99 de las pruebas) con 50k rutinas
+    "1m-pesado": {"usuarios": 1_000_000, "rutinas_mediana": 20, "rutinas_p99": 400,
+                  "notas_media": 8, "alumnos": 1_000_000, "pesados": 1, "rutinas_pesado": 50_000},
+}
+
+# Prefijos para que los ObjectId sean deterministas y no choquen entre colecciones
+# (4 lo usan los alumnos, generados por flask_mongo_crud_alumnos/seed.py)
+TIPO_USUARIO, TIPO_RUTINA, TIPO_NOTA = 1, 2, 3
+
+EJERCICIOS = {
+    "Fuerza": ["Sentadilla", "Press de banca", "Peso muerto", "Dominadas", "Remo con barra",
+               "Press militar", "Zancadas", "Curl de bíceps", "Fondos", "Hip thrust"],
+    "Cardio": ["Carrera", "Bicicleta", "Remo", "Saltar la cuerda", "Elíptica", "Natación"],
+    "Flexibilidad": ["Estiramiento de isquiotibiales", "Postura del niño", "Gato-camello",
+                     "Apertura de cadera", "Estiramiento de hombro"],
+    "HIIT": ["Burpees", "Mountain climbers", "Jumping jacks", "Sprints", "Sentadilla con salto",
+             "Plancha con toque de hombro"],
+}
+SERIES = [2, 3, 4, 5]
+REPETICIONES = [6, 8, 10, 12, 15, 20]
+DESCANSOS = [30, 45, 60, 90]
+DURACIONES_CARDIO = [10, 15, 20, 30]
+CATEGORIAS_NOTA = ["General", "Nutrición", "Entrenamiento", "Progreso", "Objetivos"]
+
+_db = None
+_db_alumnos = None
+_password = None
+
+
+def object_id(fecha, tipo, indice, secuencia=0):
+    # 4 bytes de timestamp + 1 de tipo + 4 de índice de usuario + 3 de secuencia
+    segundos = int((fecha - datetime(1970, 1, 1)).total_seconds())
+    return ObjectId(struct.pack(">IBI", segundos, tipo, indice) + secuencia.to_bytes(3, "big"))
+
+
+def rng_para(semilla, tipo, indice):
+    return random.Random(f"{semilla}:{tipo}:{indice}")
+
+
+def iniciar_worker(uri, db_alumnos, password):
+    global _db, _db_alumnos, _password
+    client = MongoClient(uri)
+    _db = client.get_default_database()
+    _db_alumnos = client[db_alumnos]
+    _password = password
+
+
+def insertar_por_lotes(coleccion, documentos, lote):
+    """Inserta en lotes desordenados y devuelve (insertados, omitidos).
+
+    Los _id son deterministas, así que repetir el seed sin --limpiar choca con
+    los documentos ya cargados: esos se cuentan como omitidos en vez de abortar.
+    """
+    insertados = omitidos = 0
+    for i in range(0, len(documentos), lote):
+        parte = documentos[i:i + lote]
+        try:
+            coleccion.insert_many(parte, ordered=False)
+            insertados += len(parte)
+        except BulkWriteError as e:
+            errores = e.details.get("writeErrors", [])
+            if e.details.get("writeConcernErrors") or any(err.get("code") != 11000 for err in errores):
+                raise
+            insertados += e.details.get("nInserted", 0)
+            omitidos += len(errores)
+    return insertados, omitidos
+
+
+def sumar_insercion(conteo, coleccion, resultado):
+    insertados, omitidos = resultado
+    conteo[coleccion] += insertados
+    conteo["omitidos"] += omitidos
+
+
+def cantidad_rutinas(rng, config, indice):
+    if indice < config["pesados"]:
+        return config["rutinas_pesado"]
+    # Lognormal ajustada para que la mediana y el percentil 99 coincidan con el perfil
+    mu = math.log(config["rutinas_mediana"])
+    sigma = math.log(config["rutinas_p99"] / config["rutinas_mediana"]) / 2.326
+    return int(rng.lognormvariate(mu, sigma))
+
+
+def fechas_completadas(rng, cantidad, hoy):
+    """Reparte `cantidad` finalizaciones en rachas hacia atrás desde `hoy`.
+
+    Alterna rachas largas (media de 3 semanas) con pausas cortas, así que
+    los usuarios con muchas rutinas acumulan rachas de varios meses. Los
+    usuarios extremos completan varias por día para que su historial quepa
+    en unos cuatro años.
+    """
+    base_por_dia = max(1, cantidad // 1200)
+    fechas = []
+    dia = hoy if rng.random() < 0.6 else hoy - timedelta(days=rng.randint(1, 5))
+    while len(fechas) < cantidad:
+        racha = max(1, int(rng.expovariate(1 / 21)))
+        for _ in range(racha):
+            por_dia = base_por_dia + (0 if rng.random() < 0.8 else 1)
+            for _ in range(min(por_dia, cantidad - len(fechas))):
+                fechas.append(dia.replace(hour=rng.randint(6, 21), minute=rng.randint(0, 59)))
+            dia -= timedelta(days=1)
+            if len(fechas) >= cantidad:
+                break
+        dia -= timedelta(days=max(1, int(rng.expovariate(1 / 3))))
+    return fechas
+
+
+def definicion_ejercicio(nombre, *parametros):
+    if len(parametros) == 1:
+        return {"nombre": nombre, "duracion": parametros[0]}
+    series, repeticiones, descanso = parametros
+    return {"nombre": nombre, "series": series, "repeticiones": repeticiones, "descanso": descanso}
+
+
+@lru_cache(maxsize=None)
+def id_definicion(nombre, *parametros):
+    return id_ejercicio(definicion_ejercicio(nombre, *parametros))
+
+
+def catalogo_completo():
+    """Todas las definiciones que puede generar el seed, indexadas por id."""
+    definiciones = {}
+    for tipo, nombres in EJERCICIOS.items():
+        if tipo == "Cardio":
+            combinaciones = product(nombres, DURACIONES_CARDIO)
+        else:
+            combinaciones = product(nombres, SERIES, REPETICIONES, DESCANSOS)
+        for combinacion in combinaciones:
+            definiciones[id_definicion(*combinacion)] = definicion_ejercicio(*combinacion)
+    return definiciones
+
+
+def generar_ejercicios(rng, tipo):
+    """Ids del catálogo de ejercicios, como los guarda guardar_rutina."""
+    nombres = rng.sample(EJERCICIOS[tipo], k=min(len(EJERCICIOS[tipo]), rng.randint(3, 6)))
+    if tipo == "Cardio":
+        return [id_definicion(nombre, rng.choice(DURACIONES_CARDIO)) for nombre in nombres]
+    return [
+        id_definicion(nombre, rng.choice(SERIES), rng.choice(REPETICIONES), rng.choice(DESCANSOS))
+        for nombre in nombres
+    ]
+
+
+def generar_usuario(semilla, config, indice):
+    hoy = config["fecha_referencia"]
+    rng = rng_para(semilla, TIPO_USUARIO, indice)
+    fecha_registro = hoy - timedelta(days=rng.randint(30, 1500), seconds=rng.randint(0, 86399))
+    usuario_id = object_id(fecha_registro, TIPO_USUARIO, indice)
+    nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}"
+
+    usuario = {
+        "_id": usuario_id,
+        "nombre": nombre,
+        "email": f"usuario{indice}@example.com",
+        "password": _password,
+        "fecha_registro": fecha_registro,
+        "descripcion": "¡Bienvenido a Healthy Life! Comienza tu journey fitness.",
+        "especialidad": rng.choice(list(EJERCICIOS)),
+        "etiquetas": rng.sample(["Fitness", "Salud", "Fuerza", "Cardio", "Yoga"], k=2),
+    }
+
+    total = cantidad_rutinas(rng, config, indice)
+    completadas = fechas_completadas(rng, int(total * 0.9), hoy)
+    rutinas = []
+    for secuencia in range(total):
+        tipo = rng.choice(list(EJERCICIOS))
+        if secuencia < len(completadas):
+            fecha_completada = completadas[secuencia]
+            fecha_creacion = fecha_completada - timedelta(hours=rng.randint(0, 72))
+        else:
+            fecha_completada = None
+            fecha_creacion = hoy - timedelta(days=rng.randint(0, 30), hours=rng.randint(0, 23))
+        rutinas.append({
+            "_id": object_id(fecha_creacion, TIPO_RUTINA, indice, secuencia),
+            "usuario_id": usuario_id,
+            "nombre": f"{tipo} {secuencia + 1}",
+            "descripcion": "",
+            "tipo": tipo,
+            "duracion": rng.choice([20, 30, 45, 60, 90]),
+            "ejercicios_ids": generar_ejercicios(rng, tipo),
+            "fecha_creacion": fecha_creacion,
+            "fecha_actualizacion": fecha_completada or fecha_creacion,
+            "completada": fecha_completada is not None,
+            "fecha_completada": fecha_completada,
+        })
+
+    notas = []
+    for secuencia in range(int(rng.expovariate(1 / config["notas_media"]))):
+        fecha_creacion = hoy - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1439))
+        notas.append({
+            "_id": object_id(fecha_creacion, TIPO_NOTA, indice, secuencia),
+            "usuario_id": usuario_id,
+            "titulo": f"Nota {secuencia + 1}",
+            "descripcion": "Sentí buena energía en el entrenamiento. " * rng.randint(1, 4),
+            "categoria": rng.choice(CATEGORIAS_NOTA),
+            "fecha_creacion": fecha_creacion,
+            "fecha_actualizacion": fecha_creacion + timedelta(days=rng.randint(0, 3)),
+        })
+
+    usuario["estadisticas"] = {
+        "total_rutinas": len(rutinas),
+        "rutinas_completadas": len(completadas),
+        "total_notas": len(notas),
+    }
+    return usuario, rutinas, notas
+
+
+def tarea_usuarios(args):
+    semilla, config, inicio, fin, lote = args
+    usuarios, rutinas, notas = [], [], []
+    conteo = {"users": 0, "rutinas": 0, "notas": 0, "omitidos": 0}
+
+    for indice in range(inicio, fin):
+        usuario, rutinas_usuario, notas_usuario = generar_usuario(semilla, config, indice)
+        usuarios.append(usuario)
+        rutinas.extend(rutinas_usuario)
+        notas.extend(notas_usuario)
+        # Vaciar en cuanto hay un lote completo para acotar la memoria del worker
+        if len(rutinas) >= lote:
+            sumar_insercion(conteo, "rutinas", insertar_por_lotes(_db.rutinas, rutinas, lote))
+            rutinas = []
+
+    sumar_insercion(conteo, "users", insertar_por_lotes(_db.users, usuarios, lote))
+    sumar_insercion(conteo, "rutinas", insertar_por_lotes(_db.rutinas, rutinas, lote))
+    sumar_insercion(conteo, "notas", insertar_por_lotes(_db.notas, notas, lote))
+    return conteo
+
+
+def tarea_alumnos(args):
+    semilla, inicio, fin, lote = args
+    alumnos = [generar_alumno(semilla, indice) for indice in range(inicio, fin)]
+    conteo = {"alumnos": 0, "omitidos": 0}
+    sumar_insercion(conteo, "alumnos", insertar_por_lotes(_db_alumnos.alumnos, alumnos, lote))
+    return conteo
+
+
+def rangos(total, tamano):
+    return [(inicio, min(inicio + tamano, total)) for inicio in range(0, total, tamano)]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos para Healthy Life y alumnos")
+    parser.add_argument("--perfil", choices=sorted(PERFILES), default="demo")
+    parser.add_argument("--usuarios", type=int, help="Sobrescribe el número de usuarios del perfil")
+    parser.add_argument("--rutinas-mediana", type=int, help="Mediana de rutinas por usuario")
+    parser.add_argument("--rutinas-p99", type=int, help="Percentil 99 de rutinas por usuario")
+    parser.add_argument("--notas-media", type=int, help="Media de notas por usuario")
+    parser.add_argument("--alumnos", type=int, help="Número de alumnos")
+    parser.add_argument("--pesados", type=int, help="Usuarios extremos (los primeros índices)")
+    parser.add_argument("--rutinas-pesado", type=int, help="Rutinas de cada usuario extremo")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--fecha-referencia", type=date.fromisoformat, default=date.today(),
+                        help="Día (AAAA-MM-DD) en que terminan las rachas; por defecto hoy")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lote", type=int, default=1000, help="Documentos por insert_many")
+    parser.add_argument("--usuarios-por-tarea", type=int, default=500)
+    parser.add_argument("--uri", default=MONGO_URI)
+    parser.add_argument("--db-alumnos", default="escuela", help="Base de datos de la app de alumnos")
+    parser.add_argument("--limpiar", action="store_true", help="Vacía las colecciones antes de insertar")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = dict(PERFILES[args.perfil])
+    for clave in config:
+        valor = getattr(args, clave)
+        if valor is not None:
+            config[clave] = valor
+    config["fecha_referencia"] = datetime.combine(args.fecha_referencia, datetime.min.time())
+
+    if args.limpiar:
+        client = MongoClient(args.uri)
+        db = client.get_default_database()
+        for coleccion in ("users", "rutinas", "notas", "rutinas_archivo", "eliminados", "ejercicios"):
+            db.drop_collection(coleccion)
+        client[args.db_alumnos].drop_collection("alumnos")
+
+    # El catálogo es pequeño y fijo: se inserta una vez antes de las rutinas que lo referencian
+    catalogo = catalogo_completo()
+    MongoClient(args.uri).get_default_database().ejercicios.bulk_write(
+        operaciones_catalogo(catalogo), ordered=False
+    )
+
+    # Un único hash para todos: calcularlo por usuario dominaría el tiempo de generación
+    password = generate_password_hash("password123")
 
-MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/escuela")
-client = MongoClient(MONGO_URI)
-db = client.get_default_database()
+    tareas_usuarios = [
+        (args.semilla, config, inicio, fin, args.lote)
+        for inicio, fin in rangos(config["usuarios"], args.usuarios_por_tarea)
+    ]
+    tareas_alumnos = [
+        (args.semilla, inicio, fin, args.lote)
+        for inicio, fin in rangos(config["alumnos"], args.usuarios_por_tarea * 10)
+    ]
 
-db.alumnos.delete_many({})
+    totales = {"users": 0, "rutinas": 0, "notas": 0, "alumnos": 0, "omitidos": 0}
+    inicio = time.perf_counter()
+    with Pool(args.workers, initializer=iniciar_worker,
+              initargs=(args.uri, args.db_alumnos, password)) as pool:
+        resultados = [
+            pool.imap_unordered(tarea_usuarios, tareas_usuarios),
+            pool.imap_unordered(tarea_alumnos, tareas_alumnos),
+        ]
+        for resultado in resultados:
+            for conteo in resultado:
+                for coleccion, cantidad in conteo.items():
+                    totales[coleccion] += cantidad
+                insertados = sum(totales.values()) - totales["omitidos"]
+                transcurrido = time.perf_counter() - inicio
+                print(f"\r{insertados:,} documentos ({insertados / transcurrido:,.0f} docs/s)",
+                      end="", flush=True)
 
-alumnos = [
-    {"nombre": "Edgar López", "edad": 16, "grupo": "3A", "promedio": 8.7, "correo":"edgarlopezelnegrito@gmail.com"},
-    {"nombre": "Angel Polito", "edad": 17, "grupo": "3B", "promedio": 7.9,"correo":"angelpolitoaliaselnose@gmail.com"},
-    {"nombre": " Eduardo López ", "edad": 15, "grupo": "2A", "promedio": 9.2,"correo":"caneduardoviciadoalclash@gmail.com"},
+    transcurrido = time.perf_counter() - inicio
+    omitidos = totales.pop("omitidos")
+    insertados = sum(totales.values())
+    print()
+    for coleccion, cantidad in totales.items():
+        print(f"{coleccion}: {cantidad:,}")
+    if omitidos:
+        print(f"Omitidos por _id duplicado: {omitidos:,} (usa --limpiar para recrear los datos)")
+    print(f"Seed completado: {insertados:,} documentos en {transcurrido:.1f}s "
+          f"({insertados / max(transcurrido, 1e-9):,.0f} docs/s)")
 
-]
 
-db.alumnos.insert_many(alumnos)
-print("Seed completado. Registros insertados:", db.alumnos.count_documents({}))
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+# Tiempo que se conservan las marcas de borrado; un token más viejo obliga a resincronizar todo
+DIAS_RETENCION_ELIMINADOS = 30
+
+# Las escrituras fijan fecha_actualizacion en Python antes de llegar a Mongo; el token se
+# retrasa más que el plazo máximo de una petición para no perder las que aún no se confirmaron
+MARGEN_TOKEN_SYNC = timedelta(seconds=30)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class TokenInvalido(ValueError):
+    pass
+
+
+def leer_token(since):
+    """Instante (UTC) codificado en el token, o None si no hay token."""
+    if not since:
+        return None
+    try:
+        return datetime.utcfromtimestamp(int(since) / 1000)
+    except (ValueError, OverflowError, OSError):
+        raise TokenInvalido('Token de sincronización inválido') from None
+
+
+def nuevo_token(ahora):
+    """Token (ms desde epoch) para la siguiente sincronización, retrasado MARGEN_TOKEN_SYNC."""
+    return str(int((ahora - MARGEN_TOKEN_SYNC - _EPOCH).total_seconds() * 1000))
+
+
+def requiere_completa(desde, ahora):
+    """Sin token, o con uno más viejo que las marcas de borrado, se envía todo."""
+    return desde is None or desde < ahora - timedelta(days=DIAS_RETENCION_ELIMINADOS)
+
+
+def agrupar_eliminados(marcas, existentes):
+    """Ids borrados por colección, descartando las marcas de documentos que aún existen.
+
+    La marca se escribe antes del borrado: si el borrado falla el documento
+    sigue ahí, y su marca no debe llegar a los clientes. `existentes` asocia
+    cada colección con el conjunto de ids que siguen guardados.
+    """
+    eliminados = {'rutinas': [], 'notas': []}
+    for marca in marcas:
+        if marca['documento_id'] not in existentes.get(marca['coleccion'], ()):
+            eliminados[marca['coleccion']].append(str(marca['documento_id']))
+    return eliminados
@@ -0,0 +1,59 @@
+import importlib
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos desechable para las pruebas contra Mongo; sin ella se omiten
+TEST_MONGO_URI = os.environ.get('TEST_MONGO_URI')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'mongo: necesita una base de datos de prueba en TEST_MONGO_URI')
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_MONGO_URI:
+        return
+    omitir = pytest.mark.skip(reason='TEST_MONGO_URI no definido')
+    for item in items:
+        if 'mongo' in item.keywords:
+            item.add_marker(omitir)
+
+
+@pytest.fixture(scope='session')
+def modulo_app(tmp_path_factory):
+    os.environ['MONGO_URI'] = TEST_MONGO_URI
+    os.environ['RATE_LIMIT_FILE'] = str(tmp_path_factory.mktemp('rate_limit') / 'rate_limit.bin')
+    modulo = importlib.import_module('app')
+    modulo.app.testing = True
+    yield modulo
+    modulo.mongo.cx.drop_database(modulo.mongo.db.name)
+
+
+@pytest.fixture
+def usuario(modulo_app):
+    """Id de un usuario nuevo, sin rutinas ni notas."""
+    user_id = ObjectId()
+    modulo_app.mongo.db.users.insert_one({
+        '_id': user_id,
+        'nombre': 'Prueba',
+        'email': f'{user_id}@test.local',
+        'fecha_registro': datetime.utcnow(),
+        'estadisticas': {'total_rutinas': 0, 'rutinas_completadas': 0, 'total_notas': 0}
+    })
+    return user_id
+
+
+@pytest.fixture
+def cliente(modulo_app, usuario):
+    """Cliente de Flask con la sesión de `usuario` iniciada."""
+    cliente = modulo_app.app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['user_id'] = str(usuario)
+        sesion['user_name'] = 'Prueba'
+    return cliente
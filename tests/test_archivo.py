@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def archivar(modulo_app, usuario, fechas):
+    ids = modulo_app.mongo.db.rutinas.insert_many([
+        {
+            'usuario_id': usuario,
+            'nombre': f'Rutina {i}',
+            'completada': True,
+            'fecha_creacion': fecha,
+            'fecha_completada': fecha,
+            'fecha_actualizacion': fecha
+        }
+        for i, fecha in enumerate(fechas)
+    ]).inserted_ids
+    modulo_app.mongo.db.users.update_one({'_id': usuario}, {'$set': {
+        'estadisticas': {'total_rutinas': len(ids), 'rutinas_completadas': len(ids), 'total_notas': 0}
+    }})
+    resultado = modulo_app.app.test_cli_runner().invoke(args=['archivar-rutinas'])
+    assert resultado.exit_code == 0, resultado.output
+    return ids
+
+
+@pytest.mark.mongo
+def test_se_puede_borrar_una_rutina_archivada(modulo_app, cliente, usuario):
+    dia = datetime(2024, 5, 10, 8)
+    ids = archivar(modulo_app, usuario, [dia, dia + timedelta(hours=2), dia + timedelta(days=1)])
+    db = modulo_app.mongo.db
+    assert db.rutinas.count_documents({'usuario_id': usuario}) == 0
+
+    # Queda otra rutina del 10: el día se conserva
+    assert cliente.post(f'/historial/eliminar/{ids[0]}').status_code == 200
+    archivo = db.rutinas_archivo.find_one({'usuario_id': usuario})
+    assert (archivo['total'], sorted(archivo['dias'])) == (2, ['2024-05-10', '2024-05-11'])
+
+    assert cliente.post(f'/historial/eliminar/{ids[1]}').status_code == 200
+    archivo = db.rutinas_archivo.find_one({'usuario_id': usuario})
+    assert (archivo['total'], archivo['dias']) == (1, ['2024-05-11'])
+
+    # Vacío, el documento del mes desaparece
+    assert cliente.post(f'/historial/eliminar/{ids[2]}').status_code == 200
+    assert db.rutinas_archivo.count_documents({'usuario_id': usuario}) == 0
+    assert cliente.get(f'/rutina/{ids[2]}').status_code == 404
+    assert db.users.find_one({'_id': usuario})['estadisticas'] == {
+        'total_rutinas': 0, 'rutinas_completadas': 0, 'total_notas': 0
+    }
+
+
+@pytest.mark.mongo
+def test_borrar_una_rutina_archivada_deja_marca(modulo_app, cliente, usuario):
+    ids = archivar(modulo_app, usuario, [datetime(2024, 5, 10)])
+    token = str(int((datetime.utcnow() - timedelta(minutes=1) - datetime(1970, 1, 1)).total_seconds() * 1000))
+
+    assert cliente.post(f'/historial/eliminar/{ids[0]}').status_code == 200
+    respuesta = cliente.get('/sync', query_string={'since': token}).get_json()
+    assert respuesta['eliminados']['rutinas'] == [str(ids[0])]
@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.mark.mongo
+@pytest.mark.parametrize('cuerpo', [
+    {'operaciones': [{'a': 1}]},
+    {'operaciones': [['perfil']]},
+    {'operaciones': ['perfil', 'usuarios']},
+    {'operaciones': []},
+    ['perfil'],
+])
+def test_operaciones_invalidas(cliente, cuerpo):
+    assert cliente.post('/batch', json=cuerpo).status_code == 400
+
+
+@pytest.mark.mongo
+def test_cada_operacion_consume_un_token_de_lectura(modulo_app, cliente, usuario, monkeypatch):
+    costes = []
+    monkeypatch.setattr(modulo_app.limitador, 'consumir', lambda *args: costes.append(args[-1]) or 0)
+    cliente.post('/batch', json={'operaciones': ['perfil', 'notas', 'perfil']})
+    cliente.post('/batch', json={'operaciones': [{'a': 1}]})
+    assert costes == [2, 1]
@@ -0,0 +1,76 @@
+import pytest
+
+from catalogo import (MAXIMO_BYTES_EJERCICIO, MAXIMO_CLAVES_EJERCICIO, CatalogoEjercicios,
+                      EjercicioInvalido, canonizar, id_ejercicio, normalizar_ejercicio)
+
+
+class ColeccionEnMemoria:
+    """Lo justo de una colección de pymongo para el catálogo: guarda lo que recibe y lo que se consulta."""
+
+    def __init__(self, documentos=()):
+        self.documentos = {doc['_id']: doc for doc in documentos}
+        self.escrituras = []
+        self.consultas = []
+
+    def bulk_write(self, operaciones, ordered=True):
+        self.escrituras.append(operaciones)
+
+    def find(self, filtro):
+        ids = filtro['_id']['$in']
+        self.consultas.append(ids)
+        return [self.documentos[i] for i in ids if i in self.documentos]
+
+
+def test_formas_equivalentes_comparten_id():
+    a = normalizar_ejercicio({'nombre': '  Press   de banca ', 'series': 4, 'repeticiones': '8-12'})
+    b = normalizar_ejercicio({'repeticiones': '8-12', 'nombre': 'Press de banca', 'series': 4.0})
+    assert a == b == {'nombre': 'Press de banca', 'series': 4, 'repeticiones': '8-12'}
+    assert id_ejercicio(a) == id_ejercicio(b)
+
+
+def test_admite_campos_libres():
+    ejercicio = {'nombre': 'Sentadilla', 'series': 3, 'peso': 40, 'notas': {'tempo': '3 1 1'}}
+    assert normalizar_ejercicio(ejercicio) == ejercicio
+    assert id_ejercicio(ejercicio) != id_ejercicio(dict(ejercicio, peso=45))
+
+
+@pytest.mark.parametrize('ejercicio', [
+    'Sentadilla',
+    ['Sentadilla', 3],
+    {'nombre': 'x' * MAXIMO_BYTES_EJERCICIO},
+    {f'campo{i}': i for i in range(MAXIMO_CLAVES_EJERCICIO + 1)},
+    {'nombre': 'Sentadilla', 'detalle': {f'campo{i}': i for i in range(MAXIMO_CLAVES_EJERCICIO)}},
+    {'nombre': 'Sentadilla', '$where': 'true'},
+    {'nombre': 'Sentadilla', 'peso': float('nan')},
+])
+def test_rechaza_lo_que_no_es_un_objeto_o_excede_los_limites(ejercicio):
+    with pytest.raises(EjercicioInvalido):
+        normalizar_ejercicio(ejercicio)
+
+
+def test_la_migracion_canoniza_sin_limites():
+    assert canonizar(['  Sentadilla ', 3.0]) == ['Sentadilla', 3]
+    assert canonizar({'nombre': 'x' * MAXIMO_BYTES_EJERCICIO})['nombre'] == 'x' * MAXIMO_BYTES_EJERCICIO
+
+
+def test_solo_se_escriben_las_definiciones_nuevas():
+    coleccion = ColeccionEnMemoria()
+    catalogo = CatalogoEjercicios()
+    catalogo.registrar(coleccion, [{'nombre': 'Sentadilla'}, {'nombre': 'Remo'}])
+    catalogo.registrar(coleccion, [{'nombre': 'Remo'}, {'nombre': 'Dominadas'}])
+    assert [len(operaciones) for operaciones in coleccion.escrituras] == [2, 1]
+
+
+def test_la_cache_esta_acotada_y_solo_carga_los_faltantes():
+    ejercicios = [{'nombre': f'Ejercicio {i}'} for i in range(3)]
+    coleccion = ColeccionEnMemoria(
+        {'_id': id_ejercicio(ejercicio), 'definicion': ejercicio} for ejercicio in ejercicios
+    )
+    catalogo = CatalogoEjercicios(maximo=2)
+    ids = catalogo.registrar(coleccion, ejercicios)
+
+    # El primero fue desalojado: solo se consulta ese id
+    definiciones = catalogo.hidratar(coleccion, ids)
+    assert [d['nombre'] for d in definiciones] == ['Ejercicio 0', 'Ejercicio 1', 'Ejercicio 2']
+    assert coleccion.consultas == [[ids[0]]]
+    assert len(catalogo._definiciones) == 2
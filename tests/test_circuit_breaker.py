@@ -0,0 +1,119 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from pymongo import monitoring
+from pymongo.errors import (AutoReconnect, DuplicateKeyError, ExecutionTimeout, NetworkTimeout,
+                            OperationFailure, ServerSelectionTimeoutError, WTimeoutError)
+
+import circuit_breaker
+from circuit_breaker import CacheObsoleta, CircuitBreaker, es_transitorio
+
+
+class Reloj:
+    def __init__(self, inicio=1000.0):
+        self.ahora = inicio
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', reloj)
+    monkeypatch.setattr(circuit_breaker.time, 'time', reloj)
+    return reloj
+
+
+def comando_fallido(errtype=None, code=None):
+    return SimpleNamespace(failure={'errtype': errtype, 'code': code})
+
+
+def test_se_abre_tras_umbral_fallos_seguidos(reloj):
+    cb = CircuitBreaker(umbral=3, espera=30)
+    for _ in range(2):
+        cb.failed(comando_fallido('NetworkTimeout'))
+    assert cb.permite()
+
+    cb.failed(comando_fallido(code=50))  # MaxTimeMSExpired
+    assert not cb.permite()
+    assert cb.segundos_restantes() == 30
+
+
+def test_un_exito_reinicia_la_cuenta(reloj):
+    cb = CircuitBreaker(umbral=2, espera=30)
+    cb.failed(comando_fallido('AutoReconnect'))
+    cb.succeeded(monitoring.CommandSucceededEvent(timedelta(milliseconds=5), {'ok': 1}, 'find', 1, ('localhost', 27017), None))
+    cb.failed(comando_fallido('AutoReconnect'))
+    assert cb.permite()
+
+
+def test_los_errores_de_la_consulta_no_cuentan(reloj):
+    cb = CircuitBreaker(umbral=1, espera=30)
+    cb.failed(comando_fallido('OperationFailure', code=2))
+    cb.failed(comando_fallido('DuplicateKeyError', code=11000))
+    assert cb.permite()
+
+
+def test_tras_la_espera_deja_pasar_y_un_fallo_lo_reabre(reloj):
+    cb = CircuitBreaker(umbral=2, espera=30)
+    cb.failed(comando_fallido('NetworkTimeout'))
+    cb.failed(comando_fallido('NetworkTimeout'))
+    reloj.ahora += 30
+    assert cb.permite()
+
+    # Medio abierto: el primer fallo vuelve a abrirlo entero
+    cb.failed(comando_fallido('NetworkTimeout'))
+    assert not cb.permite()
+    assert cb.segundos_restantes() == 30
+
+
+def test_tras_la_espera_un_exito_lo_cierra(reloj):
+    cb = CircuitBreaker(umbral=2, espera=30)
+    cb.failed(comando_fallido('NetworkTimeout'))
+    cb.failed(comando_fallido('NetworkTimeout'))
+    reloj.ahora += 30
+    cb.registrar_exito()
+    cb.failed(comando_fallido('NetworkTimeout'))
+    assert cb.permite()
+
+
+def test_los_heartbeats_fallidos_abren_el_circuito(reloj):
+    cb = CircuitBreaker(umbral=2, espera=30)
+    for _ in range(2):
+        cb.failed(monitoring.ServerHeartbeatFailedEvent(0.5, AutoReconnect('caído'), ('localhost', 27017)))
+    assert not cb.permite()
+
+
+@pytest.mark.parametrize('error, transitorio', [
+    (NetworkTimeout('lento'), True),
+    (AutoReconnect('caído'), True),
+    (ServerSelectionTimeoutError('sin primario'), True),
+    (ExecutionTimeout('maxTimeMS', code=50), True),
+    (WTimeoutError('write concern', code=64), True),
+    (DuplicateKeyError('duplicado', code=11000), False),
+    (OperationFailure('no autorizado', code=13), False),
+    (ValueError('no es de Mongo'), False),
+])
+def test_es_transitorio(error, transitorio):
+    assert es_transitorio(error) is transitorio
+
+
+def test_la_cache_obsoleta_caduca(reloj):
+    cache = CacheObsoleta(antiguedad_maxima=600)
+    cache.guardar(('perfil_datos', 'u1'), {'nombre': 'Ana'})
+    reloj.ahora += 600
+    assert cache.obtener(('perfil_datos', 'u1')) == (1000.0, {'nombre': 'Ana'})
+    reloj.ahora += 1
+    assert cache.obtener(('perfil_datos', 'u1')) is None
+
+
+def test_la_cache_obsoleta_descarta_la_mas_antigua(reloj):
+    cache = CacheObsoleta(maximo=2)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    cache.guardar('a', 3)
+    cache.guardar('c', 4)
+    assert cache.obtener('b') is None
+    assert cache.obtener('a')[1] == 3 and cache.obtener('c')[1] == 4
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson.objectid import ObjectId
+from flask import Flask
+
+from query_monitor import PresupuestoExcedido, RegistroConsultas
+
+
+def evento(request_id, comando='find', coleccion='rutinas', duracion_ms=0.5):
+    if comando == 'getMore':
+        cuerpo = {'getMore': 1234, 'collection': coleccion}
+    else:
+        cuerpo = {comando: coleccion, 'filter': {'usuario_id': ObjectId()}}
+    return SimpleNamespace(
+        connection_id=('localhost', 27017),
+        request_id=request_id,
+        command_name=comando,
+        command=cuerpo,
+        duration_micros=int(duracion_ms * 1000)
+    )
+
+
+def test_exceder_el_presupuesto_lanza_presupuesto_excedido():
+    registro = RegistroConsultas()
+    app = Flask(__name__)
+    app.add_url_rule('/racha/datos', 'racha_datos', lambda: '')
+
+    with pytest.raises(PresupuestoExcedido, match='racha_datos hizo 3 consultas'):
+        with registro.presupuesto('racha_datos', 2):
+            with app.test_request_context('/racha/datos'):
+                for request_id in range(3):
+                    registro.started(evento(request_id))
+                    registro.succeeded(evento(request_id))
+
+
+def test_solo_cuentan_las_consultas_de_la_ruta():
+    registro = RegistroConsultas()
+    app = Flask(__name__)
+    app.add_url_rule('/racha/datos', 'racha_datos', lambda: '')
+    app.add_url_rule('/perfil/datos', 'perfil_datos', lambda: '')
+
+    with registro.presupuesto('racha_datos', 1) as consultas:
+        for request_id, ruta in enumerate(['/racha/datos', '/perfil/datos', '/perfil/datos']):
+            with app.test_request_context(ruta):
+                registro.started(evento(request_id))
+                registro.succeeded(evento(request_id))
+    assert [c['endpoint'] for c in consultas] == ['racha_datos', 'perfil_datos', 'perfil_datos']
+
+
+def test_get_more_lento_se_registra_pero_no_cuenta_en_el_presupuesto(caplog):
+    registro = RegistroConsultas(umbral_lento_ms=100)
+    app = Flask(__name__)
+    app.add_url_rule('/sync', 'sync', lambda: '')
+
+    with registro.presupuesto('sync', 1) as consultas:
+        with app.test_request_context('/sync'):
+            for request_id, comando in enumerate(['find', 'getMore', 'getMore']):
+                registro.started(evento(request_id, comando))
+                registro.succeeded(evento(request_id, comando, duracion_ms=250))
+    assert [c['comando'] for c in consultas] == ['find', 'getMore', 'getMore']
+    lentas = [r.getMessage() for r in caplog.records if 'getMore' in r.getMessage()]
+    assert len(lentas) == 2 and 'rutinas' in lentas[0]
+
+
+@pytest.fixture
+def rutinas_de_40_dias(modulo_app, usuario):
+    db = modulo_app.mongo.db
+    db.users.update_one({'_id': usuario}, {'$set': {
+        'estadisticas': {'total_rutinas': 40, 'rutinas_completadas': 40, 'total_notas': 0}
+    }})
+    ahora = datetime.utcnow()
+    db.rutinas.insert_many([
+        {
+            'usuario_id': usuario,
+            'nombre': f'Rutina {i}',
+            'completada': True,
+            'fecha_creacion': ahora - timedelta(days=i),
+            'fecha_completada': ahora - timedelta(days=i)
+        }
+        for i in range(40)
+    ])
+    db.rutinas_archivo.insert_one({
+        'usuario_id': usuario,
+        'mes': (ahora - timedelta(days=400)).strftime('%Y-%m'),
+        'rutinas': [],
+        'total': 0,
+        'dias': [(ahora - timedelta(days=400)).strftime('%Y-%m-%d')]
+    })
+
+
+@pytest.mark.mongo
+def test_racha_datos_dentro_del_presupuesto(modulo_app, cliente, rutinas_de_40_dias):
+    with modulo_app.registro_consultas.presupuesto('racha_datos', 2):
+        respuesta = cliente.get('/racha/datos')
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['racha']['recordPersonal'] == 40
+
+
+@pytest.mark.mongo
+def test_perfil_datos_dentro_del_presupuesto(modulo_app, cliente, rutinas_de_40_dias):
+    with modulo_app.registro_consultas.presupuesto('perfil_datos', 3):
+        respuesta = cliente.get('/perfil/datos')
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['perfil']['estadisticas']['racha_actual'] == 30
@@ -0,0 +1,42 @@
+import pytest
+from bson.objectid import ObjectId
+
+from rate_limit import LimitadorTokens, _hash_clave
+
+
+def limitador(tmp_path, casillas=65536):
+    return LimitadorTokens(str(tmp_path / 'rate_limit.bin'), casillas)
+
+
+def test_admite_hasta_la_capacidad(tmp_path):
+    l = limitador(tmp_path)
+    resultados = [l.consumir('auth:10.0.0.1', 5, 5 / 60) for _ in range(7)]
+    assert resultados[:5] == [0] * 5
+    assert all(espera > 0 for espera in resultados[5:])
+
+
+def test_claves_alternadas_en_el_mismo_conjunto_se_limitan_las_dos(tmp_path):
+    # Un único conjunto: las dos claves comparten siempre las mismas casillas
+    l = limitador(tmp_path, casillas=LimitadorTokens.VIAS)
+    rechazos = {'auth:10.0.0.11': 0, 'auth:10.0.0.20': 0}
+    for _ in range(50):
+        for clave in rechazos:
+            if l.consumir(clave, 5, 5 / 60):
+                rechazos[clave] += 1
+    assert rechazos == {'auth:10.0.0.11': 45, 'auth:10.0.0.20': 45}
+
+
+def test_las_claves_se_reparten_entre_los_conjuntos(tmp_path):
+    l = limitador(tmp_path)
+    claves = [f'write:{ObjectId()}' for _ in range(10000)]
+    claves += [f'read:10.{i // 65536}.{i // 256 % 256}.{i % 256}' for i in range(10000)]
+    conjuntos = {_hash_clave(clave) % l.conjuntos for clave in claves}
+    # Con un hash uniforme, 20k claves en 16k conjuntos ocupan ~11k
+    assert len(conjuntos) > 10000
+
+
+def test_una_peticion_puede_costar_varios_tokens(tmp_path):
+    l = limitador(tmp_path)
+    assert l.consumir('read:10.0.0.1', 5, 1, coste=4) == 0
+    assert l.consumir('read:10.0.0.1', 5, 1, coste=4) == pytest.approx(3, abs=0.01)
+    assert l.consumir('read:10.0.0.1', 5, 1) == 0
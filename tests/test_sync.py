@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson.objectid import ObjectId
+
+from sincronizacion import (DIAS_RETENCION_ELIMINADOS, MARGEN_TOKEN_SYNC, TokenInvalido,
+                            agrupar_eliminados, leer_token, nuevo_token, requiere_completa)
+
+
+def test_el_token_se_retrasa_el_margen():
+    ahora = datetime(2026, 3, 1, 12, 0, 0, 123000)
+    assert leer_token(nuevo_token(ahora)) == ahora - MARGEN_TOKEN_SYNC
+
+
+@pytest.mark.parametrize('since', ['abc', '1.5', '99999999999999999999', '-99999999999999999999'])
+def test_token_invalido(since):
+    with pytest.raises(TokenInvalido):
+        leer_token(since)
+
+
+def test_sin_token_o_con_token_caducado_se_envia_todo():
+    ahora = datetime(2026, 3, 1)
+    retencion = timedelta(days=DIAS_RETENCION_ELIMINADOS)
+    assert leer_token(None) is None and leer_token('') is None
+    assert requiere_completa(None, ahora)
+    assert requiere_completa(ahora - retencion - timedelta(seconds=1), ahora)
+    assert not requiere_completa(ahora - retencion, ahora)
+
+
+def test_se_descartan_las_marcas_de_documentos_que_siguen_guardados():
+    borrada, fallida, nota = ObjectId(), ObjectId(), ObjectId()
+    marcas = [
+        {'coleccion': 'rutinas', 'documento_id': borrada},
+        {'coleccion': 'rutinas', 'documento_id': fallida},
+        {'coleccion': 'notas', 'documento_id': nota},
+    ]
+    eliminados = agrupar_eliminados(marcas, {'rutinas': {fallida}})
+    assert eliminados == {'rutinas': [str(borrada)], 'notas': [str(nota)]}
+
+
+def token_de(instante):
+    return str(int((instante - datetime(1970, 1, 1)).total_seconds() * 1000))
+
+
+@pytest.mark.mongo
+def test_escritura_confirmada_tras_la_sincronizacion_llega_en_la_siguiente(modulo_app, cliente, usuario):
+    primera = cliente.get('/sync').get_json()
+    assert primera['completo']
+
+    # Fechada antes de que se emitiera el token pero confirmada después
+    modulo_app.mongo.db.notas.insert_one({
+        'usuario_id': usuario,
+        'titulo': 'Tardía',
+        'descripcion': '',
+        'categoria': 'General',
+        'fecha_actualizacion': datetime.utcnow() - timedelta(seconds=5)
+    })
+    segunda = cliente.get('/sync', query_string={'since': primera['token']}).get_json()
+    assert not segunda['completo']
+    assert [n['titulo'] for n in segunda['notas']] == ['Tardía']
+
+
+@pytest.mark.mongo
+def test_borrado_deja_marca_y_borrado_inexistente_no(modulo_app, cliente, usuario):
+    token = token_de(datetime.utcnow() - timedelta(minutes=1))
+    nota_id = modulo_app.mongo.db.notas.insert_one({
+        'usuario_id': usuario,
+        'titulo': 'Nota',
+        'descripcion': '',
+        'categoria': 'General',
+        'fecha_actualizacion': datetime.utcnow()
+    }).inserted_id
+
+    assert cliente.delete(f'/notas/eliminar/{nota_id}').status_code == 200
+    assert cliente.delete(f'/notas/eliminar/{ObjectId()}').status_code == 404
+
+    respuesta = cliente.get('/sync', query_string={'since': token}).get_json()
+    assert respuesta['eliminados'] == {'rutinas': [], 'notas': [str(nota_id)]}
+    assert modulo_app.mongo.db.eliminados.count_documents({'usuario_id': usuario}) == 1
+
+
+@pytest.mark.mongo
+def test_la_sincronizacion_completa_incluye_el_archivo(modulo_app, cliente, usuario):
+    rutina_id = ObjectId()
+    modulo_app.mongo.db.rutinas_archivo.insert_one({
+        'usuario_id': usuario,
+        'mes': '2025-01',
+        'rutinas': [{'_id': rutina_id, 'nombre': 'Antigua', 'fecha_completada': datetime(2025, 1, 5)}],
+        'total': 1,
+        'dias': ['2025-01-05']
+    })
+    rutinas = cliente.get('/sync').get_json()['rutinas']
+    assert [(r['_id'], r['archivada']) for r in rutinas] == [(str(rutina_id), True)]